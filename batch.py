@@ -0,0 +1,115 @@
+"""Solve a day for a batch of input files in a worker pool,
+streaming the results as newline-delimited JSON as they complete.
+
+The input files are read in the main process (whole files at once) and sent
+to the workers, which parse them with the parse_bytes function of the day
+(available for day 3 and day 4) and run both parts.
+
+Run with e.g.:
+    python batch.py 3 "inputs/day_3/*.txt" --max_workers=8 > results.ndjson
+"""
+
+from __future__ import annotations
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Iterable, Iterator
+import glob
+import json
+import os
+import sys
+from runner import discover_days, load_day
+
+
+def iter_input_files(inputs: str) -> Iterator[Path]:
+    """Yield all files in a directory, or all files matching a glob pattern,
+    in sorted order."""
+    if os.path.isdir(inputs):
+        paths = Path(inputs).iterdir()
+    else:
+        paths = map(Path, glob.glob(inputs, recursive=True))
+    yield from sorted(path for path in paths if path.is_file())
+
+
+def solve_bytes(module_path: Path, data: bytes) -> tuple[object, object, int]:
+    """Returns the results of both parts for the contents of an input file,
+    and the time it took to parse and solve it in ns."""
+    module = load_day(module_path)
+    start = perf_counter_ns()
+    input = module.parse_bytes(data)
+    part1 = module.part1(input)
+    part2 = module.part2(input)
+    return part1, part2, perf_counter_ns() - start
+
+
+def get_result(path: Path, future: Future) -> dict:
+    try:
+        part1, part2, solve_ns = future.result()
+    except Exception as e:
+        return {"file": str(path), "error": repr(e)}
+    return {"file": str(path), "part1": part1, "part2": part2, "solve_ns": solve_ns}
+
+
+def run_batch(
+    module_path: Path,
+    input_files: Iterable[Path],
+    executor: Executor,
+    max_pending: int,
+) -> Iterator[dict]:
+    """Solve every input file in executor, and yield the results in the order
+    they complete (files which can't be read are reported right away).
+
+    At most max_pending files are submitted (and kept in memory) at a time:
+    the next file is only read when a result has been yielded."""
+    pending = {}  # future -> path
+    input_files = iter(input_files)
+    while True:
+        for path in input_files:
+            try:
+                data = path.read_bytes()
+            except OSError as e:
+                # e.g. removed since it was listed
+                yield {"file": str(path), "error": repr(e)}
+                continue
+            pending[executor.submit(solve_bytes, module_path, data)] = path
+            if len(pending) >= max_pending:
+                break
+        if not pending:
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield get_result(pending.pop(future), future)
+
+
+def main(day, inputs, max_workers=None, max_pending=None, threads=False):
+    """Solve day for all files in the directory (or matching the glob pattern)
+    inputs, and print a JSON line with the results of each file as it completes.
+
+    The files are solved in a process pool (or a thread pool with threads),
+    with at most max_pending files (by default 2 per worker) in flight."""
+    module_path = discover_days()[day]
+    if not hasattr(load_day(module_path), "parse_bytes"):
+        raise ValueError(f"Day {day} can't parse from bytes, so can't run in a batch")
+
+    max_workers = max_workers or os.cpu_count()
+    max_pending = max_pending or 2 * max_workers
+    executor_type = ThreadPoolExecutor if threads else ProcessPoolExecutor
+    with executor_type(max_workers) as executor:
+        for result in run_batch(
+            module_path, iter_input_files(inputs), executor, max_pending
+        ):
+            sys.stdout.write(json.dumps(result) + "\n")
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire(main)
@@ -0,0 +1,58 @@
+"""Benchmarks for parsing and both parts of every day, on generated inputs
+at several scales (see generators.py).
+
+Run with e.g.:
+    python -m pytest benchmarks/bench_days.py --bench-scales=1,100,10000
+"""
+
+from __future__ import annotations
+from pathlib import Path
+import pytest
+from generators import write_input
+from input_cache import InputCache
+from runner import discover_days, load_day
+
+DAYS = discover_days()
+
+
+@pytest.fixture(scope="session")
+def input_paths(tmp_path_factory) -> dict[tuple[int, int], Path]:
+    """Generated input files by (day, scale), generated on first use."""
+    directory = tmp_path_factory.mktemp("inputs")
+
+    class InputPaths(dict):
+        def __missing__(self, key):
+            self[key] = write_input(*key, directory)
+            return self[key]
+
+    return InputPaths()
+
+
+@pytest.fixture(scope="session")
+def input_cache(tmp_path_factory) -> InputCache:
+    """Cache of the parsed generated inputs, separate from the cache of the runner
+    (such that the large generated inputs don't evict the runner's entries)."""
+    return InputCache(tmp_path_factory.mktemp("input_cache"))
+
+
+@pytest.mark.parametrize("day", DAYS)
+def test_parse(benchmark, input_paths, day, scale):
+    module = load_day(DAYS[day])
+    input_file = str(input_paths[(day, scale)])
+    benchmark.group = f"day {day} parse"
+    benchmark.pedantic(module.parse_input, (input_file,), rounds=3)
+
+
+@pytest.mark.parametrize("part", [1, 2])
+@pytest.mark.parametrize("day", DAYS)
+def test_part(benchmark, input_paths, input_cache, day, part, scale):
+    module = load_day(DAYS[day])
+    input_file = str(input_paths[(day, scale)])
+    benchmark.group = f"day {day} part {part}"
+    # load a fresh input for every round, so nothing cached in it
+    # (e.g. the day 7 directory sizes) carries over between rounds
+    benchmark.pedantic(
+        getattr(module, f"part{part}"),
+        setup=lambda: ((input_cache.parse_input(module, input_file),), {}),
+        rounds=3,
+    )
@@ -0,0 +1,74 @@
+"""Import time of every day module, measured with python -X importtime
+in a fresh interpreter, and checked against a startup budget.
+
+Heavy dependencies (fire, and numpy where possible) are only imported
+by the code paths which need them, such that using a day module as a library
+(or running it many times from a script) doesn't pay for them up front.
+
+Run with e.g.:
+    python -m pytest benchmarks/bench_imports.py -v
+"""
+
+from __future__ import annotations
+from pathlib import Path
+import re
+import subprocess
+import sys
+import pytest
+from runner import discover_days
+
+DAYS = discover_days()
+
+# Budget of the cumulative import time in ms. Day 2, 4 and 8 need numpy for every
+# part, so it is imported along with them; all other days only use the standard
+# library at import time.
+NUMPY_DAYS = {2, 4, 8}
+BUDGET_MS = 75
+NUMPY_BUDGET_MS = 250
+
+
+def get_import_time_us(module_path: Path) -> int:
+    """Returns the cumulative import time of a module in us, as reported
+    by -X importtime when importing it in a new interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_path.stem}"],
+        cwd=module_path.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    match = re.search(
+        rf"^import time:\s*\d+ \|\s*(\d+) \| {module_path.stem}$", output, re.M
+    )
+    return int(match.group(1))
+
+
+@pytest.mark.parametrize("day", DAYS)
+def test_import_time(day):
+    # the fastest of a few runs, as startup times are noisy
+    import_ms = min(get_import_time_us(DAYS[day]) for _ in range(3)) / 1000
+    budget_ms = NUMPY_BUDGET_MS if day in NUMPY_DAYS else BUDGET_MS
+    print(f"day {day}: {import_ms:.1f} ms (budget {budget_ms} ms)")
+    assert import_ms <= budget_ms
+
+
+@pytest.mark.parametrize("day", DAYS)
+def test_no_heavy_imports(day):
+    """Importing a day module doesn't import fire or pandas,
+    nor numpy if it isn't needed for every part."""
+    module_path = DAYS[day]
+    heavy_modules = (
+        ("fire", "pandas") if day in NUMPY_DAYS else ("fire", "pandas", "numpy")
+    )
+    code = (
+        f"import sys, {module_path.stem}; "
+        f"print(*[name for name in {heavy_modules!r} if name in sys.modules])"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=module_path.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert output.split() == []
@@ -0,0 +1,20 @@
+from __future__ import annotations
+from pathlib import Path
+import sys
+
+# make the runner (and through it the day modules) importable
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-scales",
+        default="1,100",
+        help="comma separated input scales to benchmark (1 = size of the real input)",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "scale" in metafunc.fixturenames:
+        scales = [int(s) for s in metafunc.config.getoption("bench_scales").split(",")]
+        metafunc.parametrize("scale", scales, ids=[f"x{s}" for s in scales])
@@ -0,0 +1,166 @@
+"""Seeded generators for valid (synthetic) puzzle inputs of every day.
+
+Each generator returns the input text for a given scale,
+where scale 1 is about the size of the real input."""
+
+from __future__ import annotations
+from pathlib import Path
+import math
+import random
+import string
+import numpy as np
+
+
+def generate_day_1(seed: int, scale: int) -> str:
+    """~250 elves per scale, each with 1-15 items of 1000-70000 calories."""
+    rng = random.Random(seed)
+    return "\n\n".join(
+        "\n".join(str(rng.randint(1000, 70000)) for _ in range(rng.randint(1, 15)))
+        for _ in range(250 * scale)
+    )
+
+
+def generate_day_2(seed: int, scale: int) -> str:
+    """2500 rounds per scale."""
+    rng = np.random.default_rng(seed)
+    n_rounds = 2500 * scale
+    lines = np.empty((n_rounds, 4), dtype=np.uint8)
+    lines[:, 0] = rng.integers(ord("A"), ord("C") + 1, n_rounds)
+    lines[:, 1] = ord(" ")
+    lines[:, 2] = rng.integers(ord("X"), ord("Z") + 1, n_rounds)
+    lines[:, 3] = ord("\n")
+    return lines.tobytes().decode()
+
+
+def generate_day_3(seed: int, scale: int) -> str:
+    """300 rucksacks per scale (in groups of 3).
+
+    Per group the item types (except the badge) are split in 3 disjoint pools,
+    one for each elf, such that the badge is the only item in all 3 rucksacks.
+    Each rucksack holds the badge in its first compartment, and one item of
+    its pool in both compartments."""
+    rng = random.Random(seed)
+    item_types = list(string.ascii_letters)
+    lines = []
+    for _ in range(100 * scale):
+        rng.shuffle(item_types)
+        badge, others = item_types[0], item_types[1:]
+        for elf in range(3):
+            pool = others[17 * elf : 17 * (elf + 1)]
+            common, rest = pool[0], pool[1:]
+            n_items = rng.randint(1, 7)
+            first = [badge, common, *rest[:n_items]]
+            second = [common, *rest[n_items : 2 * n_items + 1]]
+            rng.shuffle(first)
+            rng.shuffle(second)
+            lines.append("".join(first + second))
+    return "\n".join(lines)
+
+
+def generate_day_4(seed: int, scale: int) -> str:
+    """1000 pairs of section ranges (within 1-99) per scale."""
+    rng = random.Random(seed)
+
+    def section_range() -> str:
+        start = rng.randint(1, 99)
+        return f"{start}-{rng.randint(start, 99)}"
+
+    return "\n".join(
+        f"{section_range()},{section_range()}" for _ in range(1000 * scale)
+    )
+
+
+def generate_day_5(seed: int, scale: int) -> str:
+    """9 stacks with 8 boxes (times sqrt(scale)) each, and 500 commands per scale."""
+    rng = random.Random(seed)
+    n_stacks = 9
+    height = 8 * math.isqrt(scale)
+    heights = [height] * n_stacks
+    rows = [
+        " ".join(f"[{rng.choice(string.ascii_uppercase)}]" for _ in range(n_stacks))
+        for _ in range(height)
+    ]
+    rows.append(" ".join(f" {key} " for key in range(1, n_stacks + 1)))
+
+    commands = []
+    for _ in range(500 * scale):
+        from_idx = rng.choice([idx for idx in range(n_stacks) if heights[idx] > 0])
+        to_idx = rng.choice([idx for idx in range(n_stacks) if idx != from_idx])
+        amount = rng.randint(1, min(heights[from_idx], 30))
+        heights[from_idx] -= amount
+        heights[to_idx] += amount
+        commands.append(f"move {amount} from {from_idx + 1} to {to_idx + 1}")
+    return "\n".join(rows) + "\n\n" + "\n".join(commands)
+
+
+def generate_day_6(seed: int, scale: int) -> str:
+    """A signal of 4096 characters per scale, with both markers at the very end."""
+    rng = np.random.default_rng(seed)
+    length = 4096 * scale
+    # 3 different characters can never form a marker
+    noise = rng.integers(ord("a"), ord("c") + 1, length - 26, dtype=np.uint8)
+    return noise.tobytes().decode() + string.ascii_lowercase[::-1]
+
+
+def generate_day_7(seed: int, scale: int) -> str:
+    """A cd/ls transcript of a random directory tree with ~1000 lines per scale.
+
+    Every directory is listed once when it is entered, some directories
+    are never entered at all. File sizes shrink with scale, such that the
+    total size stays in the range where part 2 has to free up space."""
+    rng = random.Random(seed)
+    lines = ["$ cd /"]
+    n_items = 0
+
+    def list_directory(n_dirs: int) -> list[str]:
+        nonlocal n_items
+        entries = [f"dir d{n_items + idx}" for idx in range(n_dirs)] + [
+            f"{rng.randint(1000, 400000) // scale + 1} f{n_items + n_dirs + idx}.txt"
+            for idx in range(rng.randint(0, 4))
+        ]
+        n_items += len(entries)
+        rng.shuffle(entries)
+        lines.extend(["$ ls", *entries])
+        return [entry[4:] for entry in entries if entry.startswith("dir ")]
+
+    # directories (per level of the current path) that were listed but not entered
+    pending = [list_directory(20 * scale)]
+    while len(lines) < 1000 * scale and pending:
+        if pending[-1] and (len(pending) == 1 or rng.random() < 0.7):
+            name = pending[-1].pop()
+            lines.append(f"$ cd {name}")
+            pending.append(list_directory(rng.randint(1, 4)))
+        else:
+            pending.pop()
+            if pending:
+                lines.append("$ cd ..")
+    return "\n".join(lines)
+
+
+def generate_day_8(seed: int, scale: int) -> str:
+    """A square grid of ~99x99 trees per scale."""
+    rng = np.random.default_rng(seed)
+    size = round(99 * math.sqrt(scale))
+    grid = np.empty((size, size + 1), dtype=np.uint8)
+    grid[:, :-1] = rng.integers(ord("0"), ord("9") + 1, (size, size))
+    grid[:, -1] = ord("\n")
+    return grid.tobytes().decode()
+
+
+GENERATORS = {
+    1: generate_day_1,
+    2: generate_day_2,
+    3: generate_day_3,
+    4: generate_day_4,
+    5: generate_day_5,
+    6: generate_day_6,
+    7: generate_day_7,
+    8: generate_day_8,
+}
+
+
+def write_input(day: int, scale: int, directory: Path, seed: int = 2022) -> Path:
+    """Write a generated input for day at scale to directory, and return its path."""
+    path = Path(directory) / f"day_{day}_x{scale}.txt"
+    path.write_text(GENERATORS[day](seed + day, scale) + "\n")
+    return path
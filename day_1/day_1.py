@@ -1,7 +1,16 @@
 from __future__ import annotations
+from array import array
+from typing import Iterable, Iterator
+import hashlib
+import heapq
+import json
+import os
 import sys
 
 
+HOT_FUNCTIONS = ("top_k_inventories", "push_top_k")
+
+
 test_input_text = """
 1000
 2000
@@ -20,30 +29,230 @@ test_input_text = """
 """
 
 
-def sum_inventory(input: str) -> list[int]:
-    """Returns a list with the sum of calories in each elf's inventory."""
-    return [
-        sum([int(item) for item in elf_inventory_string.split("\n")])
-        for elf_inventory_string in input.strip().split("\n\n")
-    ]
+def parse_input(input_file: str) -> list[str]:
+    """Returns the lines of the input file (for running both parts on the same input,
+    otherwise an open file can be passed to part1/part2 directly)."""
+    with open(input_file, "r") as file:
+        return file.read().splitlines()
+
+
+def sum_inventory(lines: str | Iterable[str]) -> Iterator[int]:
+    """Yields the sum of calories in each elf's inventory.
+
+    lines can be the input text, or any iterable of lines (e.g. an open file),
+    only the running sum of the current inventory is kept in memory."""
+    if isinstance(lines, str):
+        lines = lines.splitlines()
+    inventory_sum = None
+    for line in lines:
+        line = line.strip()
+        if line:
+            inventory_sum = (inventory_sum or 0) + int(line)
+        elif inventory_sum is not None:
+            yield inventory_sum
+            inventory_sum = None
+    if inventory_sum is not None:
+        yield inventory_sum
+
+
+def push_top_k(heap: list[int], k: int, value: int) -> None:
+    """Add value to the min-heap with the k highest values (if it belongs there)."""
+    if len(heap) < k:
+        heapq.heappush(heap, value)
+    elif value > heap[0]:
+        heapq.heapreplace(heap, value)
+
 
+def top_k_inventories(lines: str | Iterable[str], k: int) -> list[int]:
+    """Returns the k highest inventory sums, highest first.
 
-def part1(input: str) -> int:
+    Uses a min-heap of size k, so memory is O(k) and time is O(n log k)."""
+    heap = []
+    for inventory_sum in sum_inventory(lines):
+        push_top_k(heap, k, inventory_sum)
+    return sorted(heap, reverse=True)
+
+
+def sum_top_k(lines: str | Iterable[str], k: int) -> int:
+    """Returns the sum of calories from the k elf's with the highest
+    sum of calories in their inventory."""
+    return sum(top_k_inventories(lines, k))
+
+
+def part1(lines: str | Iterable[str]) -> int:
     """Returns the max. total sum of calories in any elf's inventory."""
-    return max(sum_inventory(input))
+    return sum_top_k(lines, 1)
 
 
-def part2(input: str) -> int:
+def part2(lines: str | Iterable[str]) -> int:
     """Returns the sum of calories from the 3 elf's with the highest
     sum of calories in their inventory."""
-    return sum(sorted(sum_inventory(input), reverse=True)[0:3])
+    return sum_top_k(lines, 3)
+
+
+class InventoryIndex:
+    """Incremental index of the inventory sums in an input file that only grows
+    (new items and elves are appended to it).
+
+    The index holds the byte offset up to which the file has been processed,
+    the sum of the last (possibly still growing) inventory, and a min-heap
+    with the k highest sums of the completed inventories. The sums of all
+    completed inventories are appended to a separate binary totals file.
+    update() only reads the data after the stored offset, so the cost of an
+    update is proportional to the appended data.
+
+    A last line without a newline is not stored in the index (it may still be
+    written to), but is counted in the last inventory by top() until the next update.
+
+    The index is written atomically, and the totals file is truncated to the
+    saved number of elves before appending, so an update which is interrupted
+    leaves the previous state. The index also stores a hash of the start and end
+    of the processed data: if those changed, the file was replaced and the index
+    is rebuilt."""
+
+    # number of bytes at the start and at the end of the processed data to hash
+    FINGERPRINT_SIZE = 4096
+
+    def __init__(self, input_file: str, index_file: str | None = None, k: int = 3):
+        self.input_file = input_file
+        self.index_file = index_file or f"{input_file}.index.json"
+        self.totals_file = f"{self.index_file}.totals"
+        self.k = k
+        self.load()
+        # value of a last line without a newline, read again by every update
+        self.tail_value = None
+
+    def reset(self) -> None:
+        """Start over with an empty index."""
+        self.offset = 0
+        self.n_elves = 0
+        self.inventory_sum = None
+        self.heap = []
+        if os.path.exists(self.totals_file):
+            os.remove(self.totals_file)
+
+    def get_fingerprint(self, offset: int) -> str:
+        """Returns a hash of the first and last FINGERPRINT_SIZE bytes
+        of the first offset bytes of the input file."""
+        digest = hashlib.sha256()
+        with open(self.input_file, "rb") as f:
+            digest.update(f.read(min(offset, self.FINGERPRINT_SIZE)))
+            f.seek(max(offset - self.FINGERPRINT_SIZE, 0))
+            digest.update(f.read(min(offset, self.FINGERPRINT_SIZE)))
+        return digest.hexdigest()
+
+    def load(self) -> None:
+        try:
+            with open(self.index_file, "r") as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.reset()
+            return
+        if (
+            state["k"] < self.k
+            or os.path.getsize(self.input_file) < state["offset"]
+            or self.get_fingerprint(state["offset"]) != state["fingerprint"]
+            or not os.path.exists(self.totals_file)
+            or os.path.getsize(self.totals_file) < 8 * state["n_elves"]
+        ):
+            # index can't answer the requested k, the file was rewritten,
+            # or the totals are missing
+            self.reset()
+            return
+        self.k = state["k"]
+        self.offset = state["offset"]
+        self.n_elves = state["n_elves"]
+        self.inventory_sum = state["inventory_sum"]
+        self.heap = state["heap"]
+
+    def save(self) -> None:
+        state = {
+            "k": self.k,
+            "offset": self.offset,
+            "fingerprint": self.get_fingerprint(self.offset),
+            "n_elves": self.n_elves,
+            "inventory_sum": self.inventory_sum,
+            "heap": self.heap,
+        }
+        # write to a temporary file first, such that an interrupted save
+        # never leaves a partially written index
+        tmp_file = f"{self.index_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_file, self.index_file)
+
+    def update(self) -> None:
+        """Process the (complete) lines appended since the last update,
+        and save the index."""
+        totals = array("q")
+        self.tail_value = None
+        with open(self.input_file, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # last line of a complete file or a partially written line,
+                    # don't advance the offset such that it is read again next time
+                    line = line.strip()
+                    self.tail_value = int(line) if line else None
+                    break
+                self.offset += len(line)
+                line = line.strip()
+                if line:
+                    self.inventory_sum = (self.inventory_sum or 0) + int(line)
+                elif self.inventory_sum is not None:
+                    totals.append(self.inventory_sum)
+                    push_top_k(self.heap, self.k, self.inventory_sum)
+                    self.inventory_sum = None
+        with open(self.totals_file, "ab") as f:
+            # drop any totals appended by an update that didn't get to save the index
+            f.truncate(self.n_elves * totals.itemsize)
+            totals.tofile(f)
+        self.n_elves += len(totals)
+        self.save()
+
+    def top(self, n: int) -> list[int]:
+        """Returns the n (<= k) highest inventory sums, highest first,
+        including the last inventory."""
+        assert n <= self.k, f"Index only keeps the top {self.k} inventories"
+        candidates = list(self.heap)
+        if self.tail_value is not None:
+            candidates.append((self.inventory_sum or 0) + self.tail_value)
+        elif self.inventory_sum is not None:
+            candidates.append(self.inventory_sum)
+        return sorted(candidates, reverse=True)[:n]
+
+    def get_totals(self) -> array:
+        """Returns the sums of all completed inventories."""
+        totals = array("q")
+        with open(self.totals_file, "rb") as f:
+            totals.fromfile(f, self.n_elves)
+        return totals
+
+
+def run_example_checks():
+    assert part1(test_input_text) == 24000
+    assert part2(test_input_text) == 45000
+    assert part1(test_input_text.splitlines()) == 24000
+    assert part2(test_input_text.splitlines()) == 45000
+
+
+def main(input_file: str, index_file: str | None = None):
+    """If an index_file is given, the input is processed incrementally
+    (only data appended since the previous run is read), see InventoryIndex."""
+    run_example_checks()
 
+    if index_file is not None:
+        index = InventoryIndex(input_file, index_file)
+        index.update()
+        top_3 = index.top(3)
+    else:
+        # single pass over the file: part 1 is the top item of the top 3
+        with open(input_file, "r") as file:
+            top_3 = top_k_inventories(file, 3)
 
-assert part1(test_input_text) == 24000
-assert part2(test_input_text) == 45000
+    print(f"Part One: {top_3[0]}")
+    print(f"Part Two: {sum(top_3)}")
 
-with open(sys.argv[1], "r") as input_file:
-    input_text = input_file.read()
 
-print(f"Part One: {part1(input_text)}")
-print(f"Part Two: {part2(input_text)}")
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -1,13 +1,10 @@
 from __future__ import annotations
-import fire
-import pandas as pd
+import mmap
+import os
+import numpy as np
 
 
-def parse_input(input_file: str) -> pd.DataFrame:
-    """Returns the input file as a 2-column dataframe."""
-    return pd.read_csv(input_file, delimiter=" ", header=None).set_axis(
-        ["opponent_move", "unknown_command"], axis=1
-    )
+HOT_FUNCTIONS = ("moves_from_buffer", "encode_rounds", "total_score")
 
 
 def get_shape_score(response_move: str) -> int:
@@ -36,39 +33,95 @@ def calc_response_move(opponent_move: str, target: str) -> int:
     return lookup_dict[opponent_move][target]
 
 
-def part1(df: pd.DataFrame) -> int:
-    df["response_move"] = df.unknown_command
-    df["shape_score"] = [get_shape_score(move) for move in df.response_move]
-    df["win_score"] = [
-        get_win_score(opponent_move, response_move)
-        for opponent_move, response_move in zip(df.opponent_move, df.response_move)
+# Each round is encoded as a single int in 0..8: 3 * opponent_move + unknown_command,
+# with A/B/C and X/Y/Z both mapped to 0/1/2.
+# The score tables below give the total score for each of those 9 round codes.
+SCORE_TABLE_PART1 = np.array(
+    [
+        get_shape_score(command) + get_win_score(opponent_move, command)
+        for opponent_move in "ABC"
+        for command in "XYZ"
     ]
-    df["total_score"] = df.shape_score + df.win_score
+)
+SCORE_TABLE_PART2 = np.array(
+    [
+        get_shape_score(calc_response_move(opponent_move, command))
+        + get_win_score(opponent_move, calc_response_move(opponent_move, command))
+        for opponent_move in "ABC"
+        for command in "XYZ"
+    ]
+)
 
-    return sum(df.total_score)
 
+def moves_from_buffer(buffer) -> tuple[np.Array, np.Array]:
+    """Return the opponent moves and the commands (both as uint8 codes in 0..2)
+    directly from the raw input bytes (e.g. bytes or a memory-mapped file).
 
-def part2(df: pd.DataFrame) -> int:
-    df["target"] = df.unknown_command
-    df["response_move"] = [
-        calc_response_move(opponent_move, target)
-        for opponent_move, target in zip(df.opponent_move, df.target)
-    ]
-    df["shape_score"] = [get_shape_score(move) for move in df.response_move]
-    df["win_score"] = [
-        get_win_score(opponent_move, response_move)
-        for opponent_move, response_move in zip(df.opponent_move, df.response_move)
-    ]
-    df["total_score"] = df.shape_score + df.win_score
+    Every line is 4 bytes ("A X\\n", or 5 bytes with "\\r\\n" line endings),
+    so the moves are at fixed offsets and no parsing is needed
+    (line endings after the last line are optional)."""
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    end = len(data)
+    while end > 0 and data[end - 1] in b"\r\n":
+        end -= 1
+    line_length = 5 if end > 3 and data[3] == ord("\r") else 4
+    line_ending = b"\r\n" if line_length == 5 else b"\n"
+    if end > 0 and (end + line_length - 3) % line_length != 0:
+        raise ValueError(f"Lines should be 3 characters, followed by {line_ending!r}")
+    data = data[:end]
+
+    opponent_moves = data[0::line_length] - np.uint8(ord("A"))
+    commands = data[2::line_length] - np.uint8(ord("X"))
+    # (invalid characters below "A" or "X" wrap around to large values)
+    if np.any(opponent_moves > 2) or np.any(commands > 2):
+        raise ValueError("Moves should be A, B or C followed by X, Y or Z")
+    if np.any(data[1::line_length] != ord(" ")) or any(
+        np.any(data[3 + idx :: line_length] != byte)
+        for idx, byte in enumerate(line_ending)
+    ):
+        raise ValueError(f"Lines should be 3 characters, followed by {line_ending!r}")
+    return opponent_moves, commands
+
+
+def parse_input(input_file: str) -> tuple[np.Array, np.Array]:
+    """Returns the opponent move and command codes of the input file."""
+    with open(input_file, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # empty files can't be memory mapped
+            return moves_from_buffer(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            # the subtraction copies the moves, so nothing refers to the buffer
+            return moves_from_buffer(buffer)
+
+
+def encode_rounds(opponent_moves: np.Array, commands: np.Array) -> np.Array:
+    """Return the round code of every round, for the codes of the moves."""
+    return opponent_moves * np.uint8(3) + commands
 
-    return sum(df.total_score)
+
+def total_score(round_codes: np.Array, score_table: np.Array) -> int:
+    """Return the total score of all rounds.
+
+    Counts how often each of the 9 round codes occurs,
+    so the score table is only applied once per code instead of once per round."""
+    return int(np.bincount(round_codes, minlength=9) @ score_table)
+
+
+def part1(input: tuple[np.Array, np.Array]) -> int:
+    return total_score(encode_rounds(*input), SCORE_TABLE_PART1)
+
+
+def part2(input: tuple[np.Array, np.Array]) -> int:
+    return total_score(encode_rounds(*input), SCORE_TABLE_PART2)
 
 
 def main(input_file):
-    df = parse_input(input_file)
-    print(f"part 1: {part1(df)}")
-    print(f"part 2: {part2(df)}")
+    input = parse_input(input_file)
+    print(f"part 1: {part1(input)}")
+    print(f"part 2: {part2(input)}")
 
 
 if __name__ == "__main__":
+    import fire
+
     fire.Fire(main)
@@ -1,17 +1,9 @@
 from __future__ import annotations
-import math
 import functools
-import fire
+from typing import Iterator, Sequence
 
 
-def parse_input(input_file: str) -> list[int]:
-    with open(input_file) as file:
-        lines = [line.rstrip() for line in file]
-    return [get_str_priorities(line) for line in lines]
-
-
-def split_middle(l: list) -> list[list]:
-    return l[: len(l) // 2], l[len(l) // 2 :]
+HOT_FUNCTIONS = ("get_item_mask", "get_common_item")
 
 
 def get_char_priority(char: str) -> int:
@@ -24,44 +16,134 @@ def get_char_priority(char: str) -> int:
         return (ord(char) - ascii_idx) + 1
 
 
-def get_str_priorities(s: str) -> list[int]:
-    return [get_char_priority(char) for char in s]
+# Lookup table from byte value to a mask with only the bit of the item priority set
+# (e.g. b"a" -> 1 << 1, b"Z" -> 1 << 52). Any other byte (e.g. newlines) maps to 0.
+PRIORITY_BITS = [
+    (
+        1 << get_char_priority(chr(byte))
+        if chr(byte).isascii() and chr(byte).isalpha()
+        else 0
+    )
+    for byte in range(256)
+]
+
+
+@functools.cache
+def get_priority_bits_array() -> np.Array:
+    """PRIORITY_BITS as numpy array, created on first use of the batched path
+    (such that importing this module doesn't import numpy)."""
+    import numpy as np
+
+    return np.array(PRIORITY_BITS, dtype=np.uint64)
+
+
+def parse_bytes(data: bytes) -> list[bytes]:
+    return [line.rstrip() for line in data.splitlines()]
+
+
+def parse_input(input_file: str) -> list[bytes]:
+    with open(input_file, "rb") as file:
+        return parse_bytes(file.read())
+
+
+def split_middle(l: Sequence) -> tuple[Sequence, Sequence]:
+    return l[: len(l) // 2], l[len(l) // 2 :]
+
+
+def get_item_mask(items: bytes) -> int:
+    """Returns a mask with a bit set for the priority of every item in items."""
+    mask = 0
+    for byte in items:
+        mask |= PRIORITY_BITS[byte]
+    return mask
 
 
-def get_common_item(bags: list[list[int]]) -> int:
-    sets = [set(bag) for bag in bags]
-    intersect_set = functools.reduce(lambda bag1, bag2: bag1 & bag2, sets)
-    assert len(intersect_set) == 1, "Bags should contain a single common item"
-    return intersect_set.pop()
+def get_common_item(masks: Sequence[int]) -> int:
+    """Returns the priority of the single item present in all item masks."""
+    common_mask = functools.reduce(lambda mask1, mask2: mask1 & mask2, masks)
+    assert common_mask.bit_count() == 1, "Bags should contain a single common item"
+    return common_mask.bit_length() - 1
 
 
-def split_groups_n(bags: list[list[int]], n: int) -> dict[int, list[list[int]]]:
-    keys = [math.floor(i / n) for i in range(len(bags))]
-    d = {}
-    for key in set(keys):
-        d[key] = []
-    for key, bag in zip(keys, bags):
-        d[key].append(bag)
-    return d
+def split_groups_n(bags: Sequence, n: int) -> Iterator[tuple]:
+    """Yield consecutive groups of n bags, without copying the bags.
+    The number of bags must be a multiple of n.
 
+    For numpy arrays use bags.reshape(-1, n) instead, which is a view."""
+    assert len(bags) % n == 0, f"Bags can't be split in groups of {n}"
+    return zip(*[iter(bags)] * n)
 
-def part1(input: list[int]) -> int:
-    split_input = [split_middle(l) for l in input]
-    common_items = [get_common_item(bag) for bag in split_input]
-    return sum(common_items)
 
+def part1(input: list[bytes]) -> int:
+    return sum(
+        get_common_item([get_item_mask(half) for half in split_middle(line)])
+        for line in input
+    )
 
-def part2(input: list[int]) -> int:
-    grouped_bags = split_groups_n(input, 3)
-    common_items = [get_common_item(group) for group in grouped_bags.values()]
-    return sum(common_items)
 
+def part2(input: list[bytes]) -> int:
+    masks = [get_item_mask(line) for line in input]
+    return sum(get_common_item(group) for group in split_groups_n(masks, 3))
 
-def main(input_file):
-    input = parse_input(input_file)
-    print(f"part 1: {part1(input)}")
-    print(f"part 2: {part2(input)}")
+
+def parse_input_batched(input_file: str) -> tuple[np.Array, np.Array, np.Array]:
+    """Returns the item bits of every byte in the input file,
+    and the start and end index of every line in there."""
+    import numpy as np
+
+    with open(input_file, "rb") as file:
+        data = np.frombuffer(file.read().rstrip() + b"\n", dtype=np.uint8)
+    line_ends = np.flatnonzero(data == ord("\n"))
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+    return get_priority_bits_array()[data], line_starts, line_ends
+
+
+def get_common_items_batched(masks: np.Array) -> np.Array:
+    """Returns the priority of the common item of every row of item masks."""
+    import numpy as np
+
+    common_masks = np.bitwise_and.reduce(masks, axis=1)
+    assert np.all(
+        (common_masks != 0) & (common_masks & (common_masks - np.uint64(1)) == 0)
+    ), "Bags should contain a single common item"
+    # masks are single powers of two below 2**53, so the float exponent is exact
+    return np.frexp(common_masks.astype(np.float64))[1] - 1
+
+
+def part1_batched(
+    item_bits: np.Array, line_starts: np.Array, line_ends: np.Array
+) -> int:
+    import numpy as np
+
+    # every line is split in 2 segments: [start, middle) and [middle, next start),
+    # the latter includes the newline which does not contain any item bits.
+    middles = line_starts + (line_ends - line_starts) // 2
+    segment_starts = np.column_stack((line_starts, middles)).ravel()
+    masks = np.bitwise_or.reduceat(item_bits, segment_starts)
+    return int(get_common_items_batched(masks.reshape(-1, 2)).sum())
+
+
+def part2_batched(
+    item_bits: np.Array, line_starts: np.Array, line_ends: np.Array
+) -> int:
+    import numpy as np
+
+    masks = np.bitwise_or.reduceat(item_bits, line_starts)
+    return int(get_common_items_batched(masks.reshape(-1, 3)).sum())
+
+
+def main(input_file, batched=False):
+    if batched:
+        input = parse_input_batched(input_file)
+        print(f"part 1: {part1_batched(*input)}")
+        print(f"part 2: {part2_batched(*input)}")
+    else:
+        input = parse_input(input_file)
+        print(f"part 1: {part1(input)}")
+        print(f"part 2: {part2(input)}")
 
 
 if __name__ == "__main__":
+    import fire
+
     fire.Fire(main)
@@ -1,7 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
-import fire
-import re
+import numpy as np
+
+
+HOT_FUNCTIONS = ("AssignmentTable.is_in", "AssignmentTable.overlaps")
 
 
 @dataclass
@@ -17,33 +19,157 @@ class AssignmentPair:
         return self.end >= other.start and other.end >= self.start
 
 
-def parse_input(input_file: str) -> list[tuple[AssignmentPair]]:
-    with open(input_file) as file:
-        lines = [line.rstrip() for line in file]
-    split_lines = [re.split(",|-", line) for line in lines]
-    return [
-        (AssignmentPair(int(sl[0]), int(sl[1])), AssignmentPair(int(sl[2]), int(sl[3])))
-        for sl in split_lines
-    ]
+@dataclass
+class AssignmentTable:
+    """Columnar representation of all pairs of assignments.
+
+    Each column is an int array with one value per pair of elves,
+    such that the predicates can be evaluated for all pairs at once."""
+
+    start_1: np.Array
+    end_1: np.Array
+    start_2: np.Array
+    end_2: np.Array
+
+    def __len__(self) -> int:
+        return len(self.start_1)
+
+    def __getitem__(self, idx: int) -> tuple[AssignmentPair, AssignmentPair]:
+        return (
+            AssignmentPair(int(self.start_1[idx]), int(self.end_1[idx])),
+            AssignmentPair(int(self.start_2[idx]), int(self.end_2[idx])),
+        )
+
+    def is_in(self) -> np.Array:
+        """Returns true for every pair where either assignment is within
+        range of the other."""
+        return ((self.start_1 >= self.start_2) & (self.end_1 <= self.end_2)) | (
+            (self.start_2 >= self.start_1) & (self.end_2 <= self.end_1)
+        )
+
+    def overlaps(self) -> np.Array:
+        return (self.end_1 >= self.start_2) & (self.end_2 >= self.start_1)
+
+    def assignments(self) -> tuple[np.Array, np.Array]:
+        """Returns the starts and ends of all individual assignments,
+        where the assignments of pair i have index 2 * i and 2 * i + 1."""
+        return (
+            np.column_stack((self.start_1, self.start_2)).ravel(),
+            np.column_stack((self.end_1, self.end_2)).ravel(),
+        )
+
+
+@dataclass
+class IntervalNode:
+    """Node of a centered interval tree.
+
+    Holds the indices of all intervals containing center, both sorted by
+    start and sorted by end. Intervals fully left/right of center are
+    stored in the left/right subtree."""
+
+    center: float
+    by_start: np.Array
+    sorted_starts: np.Array
+    by_end: np.Array
+    sorted_ends: np.Array
+    left: IntervalNode | None
+    right: IntervalNode | None
+
+
+class IntervalIndex:
+    """Index to find all intervals overlapping a given range
+    in O(log(n)^2 + k) instead of a full scan."""
+
+    def __init__(self, starts: np.Array, ends: np.Array):
+        self.starts = starts
+        self.ends = ends
+        self.by_start = np.argsort(starts, kind="stable")
+        self.sorted_starts = starts[self.by_start]
+        self.root = self._build(np.arange(len(starts)))
+
+    def _build(self, idxs: np.Array) -> IntervalNode | None:
+        if len(idxs) == 0:
+            return None
+        starts, ends = self.starts[idxs], self.ends[idxs]
+        # Not all intervals can be left or right of the median endpoint,
+        # so both subtrees are always smaller than idxs.
+        center = float(np.median(np.concatenate((starts, ends))))
+        left, right = ends < center, starts > center
+        here = idxs[~(left | right)]
+        by_start = here[np.argsort(self.starts[here], kind="stable")]
+        by_end = here[np.argsort(self.ends[here], kind="stable")]
+        return IntervalNode(
+            center=center,
+            by_start=by_start,
+            sorted_starts=self.starts[by_start],
+            by_end=by_end,
+            sorted_ends=self.ends[by_end],
+            left=self._build(idxs[left]),
+            right=self._build(idxs[right]),
+        )
+
+    def containing(self, point: int) -> np.Array:
+        """Returns the indices of all intervals containing point."""
+        found = []
+        node = self.root
+        while node is not None:
+            if point < node.center:
+                found.append(
+                    node.by_start[: np.searchsorted(node.sorted_starts, point, "right")]
+                )
+                node = node.left
+            elif point > node.center:
+                found.append(node.by_end[np.searchsorted(node.sorted_ends, point) :])
+                node = node.right
+            else:
+                found.append(node.by_start)
+                break
+        return np.concatenate(found) if found else np.array([], dtype=int)
+
+    def overlapping(self, start: int, end: int) -> np.Array:
+        """Returns the (sorted) indices of all intervals overlapping [start, end].
 
+        These are the intervals containing start,
+        plus the intervals starting within (start, end]."""
+        lower = np.searchsorted(self.sorted_starts, start, "right")
+        upper = np.searchsorted(self.sorted_starts, end, "right")
+        starting_within = self.by_start[lower:upper]
+        return np.sort(np.concatenate((self.containing(start), starting_within)))
 
-def part1(input: list[tuple[AssignmentPair]]) -> int:
-    fully_containing_assignments = [
-        ap[0].is_in(ap[1]) or ap[1].is_in(ap[0]) for ap in input
-    ]
-    return sum(fully_containing_assignments)
 
+def parse_bytes(data: bytes) -> AssignmentTable:
+    numbers = np.array(
+        data.replace(b",", b" ").replace(b"-", b" ").split(), dtype=np.int64
+    ).reshape(-1, 4)
+    return AssignmentTable(*numbers.T.copy())
 
-def part2(input: list[tuple[AssignmentPair]]) -> int:
-    overlapping_assignments = [ap[0].overlaps(ap[1]) for ap in input]
-    return sum(overlapping_assignments)
 
+def parse_input(input_file: str) -> AssignmentTable:
+    with open(input_file, "rb") as file:
+        return parse_bytes(file.read())
 
-def main(input_file):
+
+def part1(input: AssignmentTable) -> int:
+    return int(input.is_in().sum())
+
+
+def part2(input: AssignmentTable) -> int:
+    return int(input.overlaps().sum())
+
+
+def main(input_file, query=None):
     input = parse_input(input_file)
     print(f"part 1: {part1(input)}")
     print(f"part 2: {part2(input)}")
 
+    if query is not None:
+        # query is a (start, end) range, e.g. --query=10,20
+        index = IntervalIndex(*input.assignments())
+        overlapping = index.overlapping(*query)
+        print(f"{len(overlapping)} assignments overlap {query[0]}-{query[1]}")
+
 
 if __name__ == "__main__":
+    import fire
+
     fire.Fire(main)
@@ -1,10 +1,18 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
 import math
-import re
 import functools
-import fire
-from copy import deepcopy
+from typing import Iterable, Iterator, TextIO
+
+
+HOT_FUNCTIONS = (
+    "parse_stack_text",
+    "parse_command_text",
+    "Stacks.fork",
+    "Stacks.move_multiple",
+    "Stacks.move_multiple_9001",
+)
 
 
 @dataclass
@@ -14,25 +22,59 @@ class Stacks:
     The stacks are represented as a dictionary with an (integer) key for each stack.
     (this key is the number underneath each stack in the input text.
     Each stack is represented as a list with a str element for each box.
-    The order for these lists is bottom most box first and top most box last)"""
+    The order for these lists is bottom most box first and top most box last)
+
+    The stack lists are copy-on-write: fork() returns a new Stacks object sharing
+    all lists with this one, and a list is only copied (once) when either of them
+    modifies it. owned_keys holds the keys of the lists that are not shared."""
 
     stacks: dict[list[str]]
+    owned_keys: set[int] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.owned_keys is None:
+            self.owned_keys = set(self.stacks)
+
+    def fork(self) -> Stacks:
+        """Return a copy of the stacks in O(number of stacks)."""
+        self.owned_keys = set()
+        return Stacks(dict(self.stacks), owned_keys=set())
+
+    def get_writable(self, key: int) -> list[str]:
+        """Return the list of stack key, copying it first if it is shared."""
+        if key not in self.owned_keys:
+            self.stacks[key] = list(self.stacks[key])
+            self.owned_keys.add(key)
+        return self.stacks[key]
 
     def move_single(self, from_key: int, to_key: int) -> None:
-        self.stacks[to_key].append(self.stacks[from_key].pop())
+        self.get_writable(to_key).append(self.get_writable(from_key).pop())
+
+    def take_top(self, amount: int, from_key: int) -> list[str]:
+        """Remove the top amount boxes of a stack, and return them (bottom first)."""
+        from_stack = self.get_writable(from_key)
+        split_idx = len(from_stack) - amount
+        if split_idx < 0:
+            raise IndexError(f"Can't take {amount} boxes from stack {from_key}")
+        boxes = from_stack[split_idx:]
+        del from_stack[split_idx:]
+        return boxes
 
     def move_multiple(self, amount: int, from_key: int, to_key: int) -> None:
-        for _ in range(amount):
-            self.move_single(from_key, to_key)
+        """Move amount boxes one by one (CrateMover 9000),
+        done as a single reversed slice move."""
+        boxes = self.take_top(amount, from_key)
+        if from_key != to_key:
+            # (putting boxes back on the same stack one by one keeps their order)
+            boxes.reverse()
+        self.get_writable(to_key).extend(boxes)
 
     def move_multiple_9001(self, amount: int, from_key: int, to_key: int) -> None:
-        buffer = []
-        for _ in range(amount):
-            buffer.insert(0, self.stacks[from_key].pop())
-        self.stacks[to_key] = [*self.stacks[to_key], *buffer]
+        """Move amount boxes at once, retaining their order (CrateMover 9001)."""
+        self.get_writable(to_key).extend(self.take_top(amount, from_key))
 
     def get_top_values(self) -> str:
-        return "".join([stack[-1] for stack in self.stacks.values()])
+        return "".join([stack[-1] for stack in self.stacks.values() if stack])
 
 
 def parse_stack_text(stack_text: str) -> Stacks:
@@ -41,6 +83,7 @@ def parse_stack_text(stack_text: str) -> Stacks:
     stack_text_list = stack_text.split("\n")
     stack_text_idxs = stack_text_list[-1]
     stack_text_list = stack_text_list[0:-1]
+    stack_text_list.reverse()  # put bottom value at start of each stack
 
     stacks = {}
     stack_idx = 1
@@ -48,30 +91,35 @@ def parse_stack_text(stack_text: str) -> Stacks:
         char_idx = stack_text_idxs.find(str(stack_idx))
         if char_idx == -1:
             break
-        stacks[stack_idx] = [line[char_idx] for line in stack_text_list]
-        stack_idx += 1
-
-    for stack in stacks.values():
-        stack.reverse()  # put bottom value at start of list
-        while True:
-            try:
-                stack.remove(" ")
-            except:
+        # a single pass up the column, until the first line without a box in it
+        stack = stacks[stack_idx] = []
+        for line in stack_text_list:
+            if char_idx >= len(line) or line[char_idx] == " ":
                 break
+            stack.append(line[char_idx])
+        stack_idx += 1
     return Stacks(stacks)
 
 
-def parse_command_text(command_text) -> list[list[int]]:
-    """Return a list with each command, where each command is a list of 3 ints.
+def parse_command_text(command_text: str) -> array:
+    """Return a flat array with 3 ints for each command.
     The first int is the amount of boxes to move, the second is the source column key,
-    and the third is the target column key."""
-    commands = command_text.split("\n")
-    return [[int(x) for x in re.findall("[0-9]+", command)] for command in commands]
+    and the third is the target column key.
+
+    Each command is "move ~amount~ from ~key~ to ~key~", so the numbers are
+    every second word of the text."""
+    return array("I", map(int, command_text.split()[1::2]))
+
 
+def iter_commands(commands: Iterable[int]) -> Iterator[tuple[int, int, int]]:
+    """Yield the (amount, from_key, to_key) commands from a flat array of ints."""
+    ints = iter(commands)
+    return zip(ints, ints, ints)
 
-def parse_input(input_file: str) -> tuple[Stacks, list[list[int]]]:
+
+def parse_input(input_file: str) -> tuple[Stacks, array]:
     """Parse the input text and return a Stacks object with the
-    starting state of the stacks, and a command list."""
+    starting state of the stacks, and a command table."""
     with open(input_file) as file:
         input_text = file.read().rstrip()
     stack_text, command_text = input_text.split("\n\n")
@@ -80,23 +128,121 @@ def parse_input(input_file: str) -> tuple[Stacks, list[list[int]]]:
     return stacks, commands
 
 
-def part1(stacks: Stacks, commands: list[list[int]]) -> str:
-    for command in commands:
+def stream_input(file: TextIO) -> tuple[Stacks, Iterator[tuple[int, int, int]]]:
+    """Parse the stacks from an open input file, and return them together with
+    a generator which parses the commands lazily while the file is read.
+
+    The result can be passed to part1 or part2, while the file is still open."""
+    stack_lines = []
+    for line in file:
+        if not line.strip():
+            break
+        stack_lines.append(line.rstrip("\n"))
+    stacks = parse_stack_text("\n".join(stack_lines))
+    commands = (tuple(map(int, line.split()[1::2])) for line in file if line.strip())
+    return stacks, commands
+
+
+def _as_commands(commands: array | Iterator[tuple[int, int, int]]) -> Iterator:
+    """Iterate over the commands of a command table or of a command stream."""
+    return iter_commands(commands) if isinstance(commands, array) else commands
+
+
+def part1(input: tuple[Stacks, Iterable]) -> str:
+    stacks, commands = input
+    stacks = stacks.fork()
+    for command in _as_commands(commands):
         stacks.move_multiple(*command)
     return stacks.get_top_values()
 
 
-def part2(stacks: Stacks, commands: list[list[int]]) -> str:
-    for command in commands:
+def part2(input: tuple[Stacks, Iterable]) -> str:
+    stacks, commands = input
+    stacks = stacks.fork()
+    for command in _as_commands(commands):
         stacks.move_multiple_9001(*command)
     return stacks.get_top_values()
 
 
-def main(input_file):
+def run_commands(
+    stacks: Stacks,
+    commands: array,
+    retain_order: bool,
+    snapshot_idxs: Iterable[int] = (),
+) -> dict[int, Stacks]:
+    """Execute the commands on stacks, and return a snapshot of the stacks
+    after each of the first n commands, for every n in snapshot_idxs.
+
+    retain_order selects the CrateMover 9001 (True) or 9000 (False) behavior."""
+    move = stacks.move_multiple_9001 if retain_order else stacks.move_multiple
+    snapshot_idxs = set(snapshot_idxs)
+    snapshots = {}
+    n_commands = len(commands) // 3
+    for idx, command in enumerate(iter_commands(commands)):
+        if idx in snapshot_idxs:
+            snapshots[idx] = stacks.fork()
+        move(*command)
+    if n_commands in snapshot_idxs:
+        snapshots[n_commands] = stacks.fork()
+    return snapshots
+
+
+def resolve_top_values(stacks: Stacks, commands: array, retain_order: bool) -> str:
+    """Return the top values after executing all commands, without moving any boxes.
+
+    The final height of each stack is found by only counting the moved boxes.
+    Then the commands are resolved in reverse to trace back where each top box
+    was located (stack key and depth from the top) in the initial stacks.
+    retain_order selects the CrateMover 9001 (True) or 9000 (False) behavior."""
+    heights = {key: len(stack) for key, stack in stacks.stacks.items()}
+    for amount, from_key, to_key in iter_commands(commands):
+        if heights[from_key] < amount:
+            raise IndexError(f"Can't take {amount} boxes from stack {from_key}")
+        heights[from_key] -= amount
+        heights[to_key] += amount
+
+    # (stack key, depth from top) for every top box that will exist
+    positions = [(key, 0) for key, height in heights.items() if height > 0]
+    # the reversed table holds the ints of each command in reverse order too
+    for to_key, from_key, amount in iter_commands(reversed(commands)):
+        if from_key == to_key:
+            # the boxes end up in their original order with both cranes
+            continue
+        for idx, (key, depth) in enumerate(positions):
+            if key == to_key:
+                if depth < amount:
+                    # box was part of this move
+                    positions[idx] = (
+                        from_key,
+                        depth if retain_order else amount - 1 - depth,
+                    )
+                else:
+                    positions[idx] = (key, depth - amount)
+            elif key == from_key:
+                positions[idx] = (key, depth + amount)
+
+    return "".join([stacks.stacks[key][-1 - depth] for key, depth in positions])
+
+
+def main(input_file, top_only=False, stream=False):
+    if stream:
+        # commands are parsed while they are executed, so the file is read twice
+        with open(input_file) as file:
+            print(f"part 1: {part1(stream_input(file))}")
+        with open(input_file) as file:
+            print(f"part 2: {part2(stream_input(file))}")
+        return
+
     stacks, commands = parse_input(input_file)
-    print(f"part 1: {part1(deepcopy(stacks), commands)}")
-    print(f"part 1: {part2(deepcopy(stacks), commands)}")
+    if top_only:
+        print(f"part 1: {resolve_top_values(stacks, commands, retain_order=False)}")
+        print(f"part 2: {resolve_top_values(stacks, commands, retain_order=True)}")
+    else:
+        print(f"part 1: {part1((stacks, commands))}")
+        print(f"part 2: {part2((stacks, commands))}")
 
 
 if __name__ == "__main__":
+    import fire
+
     fire.Fire(main)
@@ -1,38 +1,122 @@
 from __future__ import annotations
-import collections
-
-
-def find_first_start_packet(data: str, len_unique: int) -> int:
-    # Store the last values in a deque buffer of max. len_unique in length.
-    # Every time it is full and an item is appended it loses the oldest element.
-    # Then, check if the set from that buffer is equal to len_unique it means that
-    # it has len_unique different values in it (duplicates are lost when converting
-    # to a set)
-    buffer = collections.deque([], len_unique)
-    for idx, char in enumerate(list(data)):
-        buffer.append(char)
-        if len(set(buffer)) == len_unique:
-            return idx + 1
-    return None
-
-
-# check examples for part 1
-assert find_first_start_packet("mjqjpqmgbljsphdztnvjfqwrcgsmlb", 4) == 7
-assert find_first_start_packet("bvwbjplbgvbhsrlpgdmjqwftvncz", 4) == 5
-assert find_first_start_packet("nppdvjthqldpwncqszvftbrmjlhg", 4) == 6
-assert find_first_start_packet("nznrnfrfntjfmvfwmzdfjlvtqnbhcprsg", 4) == 10
-assert find_first_start_packet("zcfzfwzzqfrljwzlrfnpqdbhtmscgvjw", 4) == 11
-
-# check examples for part 2
-assert find_first_start_packet("mjqjpqmgbljsphdztnvjfqwrcgsmlb", 14) == 19
-assert find_first_start_packet("bvwbjplbgvbhsrlpgdmjqwftvncz", 14) == 23
-assert find_first_start_packet("nppdvjthqldpwncqszvftbrmjlhg", 14) == 23
-assert find_first_start_packet("nznrnfrfntjfmvfwmzdfjlvtqnbhcprsg", 14) == 29
-assert find_first_start_packet("zcfzfwzzqfrljwzlrfnpqdbhtmscgvjw", 14) == 26
-
-
-with open("input.txt", "r") as input_file:
-    input_text = input_file.read()
-
-print(f"day 1: {find_first_start_packet(input_text, 4)}")
-print(f"day 2: {find_first_start_packet(input_text, 14)}")
+from typing import BinaryIO, Iterable, Iterator
+import sys
+
+
+HOT_FUNCTIONS = ("find_markers",)
+
+
+def read_chunks(file: BinaryIO, chunk_size: int = 2**16) -> Iterator[bytes]:
+    """Yield the contents of a binary file object in chunks of chunk_size bytes.
+
+    (for a socket use iter(functools.partial(sock.recv, chunk_size), b"") instead)"""
+    while chunk := file.read(chunk_size):
+        yield chunk
+
+
+def iter_markers(
+    chunks: Iterable[bytes], window_lengths: Iterable[int], first_only: bool = True
+) -> Iterator[tuple[int, int]]:
+    """Yield (window_length, idx) for every marker found in a single pass over chunks,
+    where idx is the amount of bytes processed when the last window_length bytes
+    are all different.
+
+    For every byte value the index where it was last seen is stored.
+    If the current byte was already seen within the current window,
+    the window is shrunk to start right after that previous occurrence.
+    The window is then the longest run of different bytes, which is shared for
+    all window lengths: a marker is found for each length that fits in it.
+    This is O(1) per byte (per window length), and only the (unbounded) stream
+    is read chunk by chunk.
+
+    If first_only, only the first marker for each window length is yielded,
+    and iteration stops when all of those are found."""
+    window_lengths = sorted(set(window_lengths))
+    if not window_lengths:
+        return
+    last_seen = [-1] * 256
+    window_start = 0
+    idx = 0
+    for chunk in chunks:
+        for byte in chunk:
+            if last_seen[byte] >= window_start:
+                window_start = last_seen[byte] + 1
+            last_seen[byte] = idx
+            idx += 1
+            run_length = idx - window_start
+            if run_length < window_lengths[0]:
+                continue
+            if first_only:
+                # longer windows can never be complete before shorter ones
+                while window_lengths and run_length >= window_lengths[0]:
+                    yield window_lengths.pop(0), idx
+                if not window_lengths:
+                    return
+            else:
+                for window_length in window_lengths:
+                    if run_length < window_length:
+                        break
+                    yield window_length, idx
+
+
+def find_markers(
+    chunks: Iterable[bytes], window_lengths: Iterable[int]
+) -> dict[int, int | None]:
+    """Return the first marker for each window length (or None if there isn't one)."""
+    window_lengths = list(window_lengths)
+    markers = dict.fromkeys(window_lengths)
+    markers.update(iter_markers(chunks, window_lengths))
+    return markers
+
+
+def find_marker(chunks: Iterable[bytes], len_unique: int) -> int | None:
+    return find_markers(chunks, [len_unique])[len_unique]
+
+
+def find_first_start_packet(data: str | bytes, len_unique: int) -> int | None:
+    if isinstance(data, str):
+        data = data.encode()
+    return find_marker([data], len_unique)
+
+
+def parse_input(input_file: str) -> bytes:
+    with open(input_file, "rb") as file:
+        return file.read()
+
+
+def part1(data: bytes) -> int | None:
+    return find_marker([data], 4)
+
+
+def part2(data: bytes) -> int | None:
+    return find_marker([data], 14)
+
+
+def run_example_checks():
+    # check examples for part 1
+    assert find_first_start_packet("mjqjpqmgbljsphdztnvjfqwrcgsmlb", 4) == 7
+    assert find_first_start_packet("bvwbjplbgvbhsrlpgdmjqwftvncz", 4) == 5
+    assert find_first_start_packet("nppdvjthqldpwncqszvftbrmjlhg", 4) == 6
+    assert find_first_start_packet("nznrnfrfntjfmvfwmzdfjlvtqnbhcprsg", 4) == 10
+    assert find_first_start_packet("zcfzfwzzqfrljwzlrfnpqdbhtmscgvjw", 4) == 11
+
+    # check examples for part 2
+    assert find_first_start_packet("mjqjpqmgbljsphdztnvjfqwrcgsmlb", 14) == 19
+    assert find_first_start_packet("bvwbjplbgvbhsrlpgdmjqwftvncz", 14) == 23
+    assert find_first_start_packet("nppdvjthqldpwncqszvftbrmjlhg", 14) == 23
+    assert find_first_start_packet("nznrnfrfntjfmvfwmzdfjlvtqnbhcprsg", 14) == 29
+    assert find_first_start_packet("zcfzfwzzqfrljwzlrfnpqdbhtmscgvjw", 14) == 26
+
+
+def main(input_file: str = "input.txt"):
+    run_example_checks()
+
+    with open(input_file, "rb") as file:
+        markers = find_markers(read_chunks(file), [4, 14])
+
+    print(f"day 1: {markers[4]}")
+    print(f"day 2: {markers[14]}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -1,23 +1,21 @@
 from __future__ import annotations
-import fire
-from dataclasses import dataclass
-from textwrap import indent
+from array import array
+from dataclasses import dataclass, field
 import collections
 import re
-from typing import Iterable
+import sys
+from typing import Iterable, Iterator, TextIO
 
 
-def flatten(items):
-    """Yield items from any nested iterable"""
-    for x in items:
-        if isinstance(x, Iterable) and not isinstance(x, (str, bytes)):
-            for sub_x in flatten(x):
-                yield sub_x
-        else:
-            yield x
+HOT_FUNCTIONS = (
+    "FsWalker.parse_line",
+    "FsDir.add_item",
+    "FsDir.get_size",
+    "FsDir.update_sizes",
+)
 
 
-@dataclass
+@dataclass(slots=True)
 class FsFile:
     name: str
     size: int
@@ -29,27 +27,105 @@ class FsFile:
         return f"{self.name} (file, size={self.size})"
 
 
-@dataclass
+@dataclass(slots=True)
 class FsDir:
+    """Directory with its items (files and directories), indexed by name.
+
+    The total size is cached in total_size once calculated; adding an item
+    through add_item resets that cache for this directory and all its parents."""
+
     name: str
-    items: list[FsDir | FsFile]
+    items: dict[str, FsDir | FsFile]
+    parent: FsDir | None = field(default=None, repr=False, compare=False)
+    total_size: int | None = field(default=None, repr=False, compare=False)
+
+    def add_item(self, item: FsDir | FsFile) -> None:
+        if item.name in self.items:
+            # already known (e.g. from listing the same directory twice)
+            return
+        if isinstance(item, FsDir):
+            item.parent = self
+        self.items[item.name] = item
+        self.invalidate_size()
+
+    def invalidate_size(self) -> None:
+        # if a directory has no cached size, neither have its parents
+        directory = self
+        while directory is not None and directory.total_size is not None:
+            directory.total_size = None
+            directory = directory.parent
 
     def get_size(self) -> int:
-        return 0 + sum(map(lambda x: x.get_size(), self.items))
+        if self.total_size is None:
+            self.update_sizes()
+        return self.total_size
+
+    def update_sizes(self) -> None:
+        """Calculate the size of all directories without a cached size,
+        in a single (iterative) post-order pass over the tree."""
+        stack = [(self, False)]
+        while stack:
+            directory, children_done = stack.pop()
+            if children_done:
+                directory.total_size = sum(
+                    item.get_size() for item in directory.items.values()
+                )
+            else:
+                stack.append((directory, True))
+                stack.extend(
+                    (item, False)
+                    for item in directory.items.values()
+                    if isinstance(item, FsDir) and item.total_size is None
+                )
 
     def __str__(self) -> str:
-        return "\n".join(
-            [
-                f"{self.name} (dir, total_size={self.get_size()})",
-                *[indent(str(item), 2 * " ") for item in self.items],
-            ]
-        )
-
-    def get_dir_sizes(self):
-        return [
-            self.get_size(),
-            *[item.get_dir_sizes() for item in self.items if type(item) == type(self)],
-        ]
+        return "\n".join(self.iter_lines())
+
+    def iter_lines(
+        self, max_depth: int | None = None, max_entries: int | None = None
+    ) -> Iterator[str]:
+        """Yield the (indented) lines representing this directory and its items.
+
+        Items deeper than max_depth (this directory has depth 0) are left out,
+        and after max_entries lines a final "..." line is yielded instead."""
+        self.get_size()
+        stack = [(0, self)]
+        n_entries = 0
+        while stack:
+            depth, item = stack.pop()
+            if max_entries is not None and n_entries == max_entries:
+                yield "..."
+                return
+            if isinstance(item, FsDir):
+                yield f"{2 * depth * ' '}{item.name} (dir, total_size={item.total_size})"
+                if max_depth is None or depth < max_depth:
+                    stack.extend(
+                        (depth + 1, child) for child in reversed(item.items.values())
+                    )
+            else:
+                yield f"{2 * depth * ' '}{item}"
+            n_entries += 1
+
+    def render(
+        self,
+        stream: TextIO,
+        max_depth: int | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        """Write the lines of iter_lines to stream."""
+        for line in self.iter_lines(max_depth, max_entries):
+            stream.write(line + "\n")
+
+    def get_dir_sizes(self) -> Iterator[int]:
+        """Yield the size of this directory and of all directories below it."""
+        self.get_size()
+        stack = [self]
+        while stack:
+            directory = stack.pop()
+            yield directory.total_size
+            stack.extend(
+                item for item in directory.items.values() if isinstance(item, FsDir)
+            )
 
 
 class FsWalker:
@@ -64,29 +140,40 @@ class FsWalker:
     This means that further ls and dir commands act with that FsDir item as working directory.
     If the dir command is '..' then the last item of the que is removed,
     making the previous item in the que (e.g. the parent directory of the removed directory)
-    the new working directory."""
+    the new working directory.
+
+    The transcript can be fed line by line through parse_line, so it never
+    has to be fully read into memory."""
 
     def __init__(self, root_dir: FsDir):
         self.que = collections.deque([root_dir])
 
+    def parse_ls_line(self, line: str):
+        """Add the item of one line of ls output to the current (last) element in the que."""
+        argument_a, argument_b = line.rstrip().split(" ")
+        if argument_a == "dir":
+            self.que[-1].add_item(FsDir(argument_b, {}))
+        else:
+            # should be in format "~size~ ~name~"
+            self.que[-1].add_item(FsFile(name=argument_b, size=int(argument_a)))
+
     def parse_ls(self, lines: list[str]):
         """Add items to the current (last) element in the que."""
         for line in lines:
-            argument_a, argument_b = line.rstrip().split(" ")
-            if argument_a == "dir":
-                self.que[-1].items.append(FsDir(argument_b, []))
-            else:
-                # should be in format "~size~ ~name~"
-                self.que[-1].items.append(FsFile(name=argument_b, size=int(argument_a)))
+            self.parse_ls_line(line)
 
     def parse_cd(self, location: str):
         """Change queue such that last item points to requested directory."""
         if location == "..":
             self.que.pop()
+        elif location == "/":
+            while len(self.que) > 1:
+                self.que.pop()
         else:
-            self.que.append(
-                next(item for item in self.que[-1].items if item.name == location)
-            )
+            self.que.append(self.get_child(self.que[-1], location))
+
+    def get_child(self, directory: FsDir, name: str) -> FsDir:
+        return directory.items[name]
 
     def parse_command(self, command: str):
         if command.startswith("cd"):
@@ -96,46 +183,186 @@ class FsWalker:
         else:
             raise ValueError(f"Can't parse command: {command}")
 
+    def parse_line(self, line: str):
+        """Parse a single line of the transcript, which is either a command
+        (starting with "$") or a line of output of the last ls command."""
+        if line.startswith("$"):
+            command = line[1:].strip()
+            if command != "ls":
+                # ls output is handled by the following lines
+                self.parse_command(command)
+        elif line.strip():
+            self.parse_ls_line(line)
+
+    def parse_lines(self, lines: Iterable[str]):
+        for line in lines:
+            self.parse_line(line)
+
     def get_root(self):
         return self.que[0]
 
 
-def part1(root_dir: FsDir) -> int:
-    return sum(
-        [dirsize for dirsize in flatten(root_dir.get_dir_sizes()) if dirsize <= 100000]
-    )
+class FsArrays:
+    """Flat representation of a file system tree as parallel arrays,
+    with one entry per file or directory (the root directory has index 0).
+
+    For each entry the index of its parent directory, its kind (dir or file),
+    its size (0 for directories) and the id of its (interned) name are stored.
+    Entries are always added after their parent, so parent < index.
+
+    numpy is only imported once the sizes are calculated."""
+
+    KIND_DIR = 0
+    KIND_FILE = 1
+
+    def __init__(self):
+        self.parents = array("q", [-1])
+        self.kinds = array("b", [self.KIND_DIR])
+        self.sizes = array("q", [0])
+        self.name_ids = array("q", [0])
+        self.names = {"/": 0}
+        self.children = {}  # (parent index, name id) -> index
+
+    def add_item(self, parent: int, name: str, kind: int, size: int = 0) -> int:
+        name_id = self.names.setdefault(name, len(self.names))
+        if (parent, name_id) not in self.children:
+            self.children[(parent, name_id)] = len(self.parents)
+            self.parents.append(parent)
+            self.kinds.append(kind)
+            self.sizes.append(size)
+            self.name_ids.append(name_id)
+        return self.children[(parent, name_id)]
+
+    def get_child(self, parent: int, name: str) -> int:
+        return self.children[(parent, self.names[name])]
+
+    def get_depths(self) -> np.Array:
+        """Return the depth of every entry (0 for the root directory),
+        using pointer jumping (O(n log(depth)))."""
+        import numpy as np
+
+        jumps = np.frombuffer(self.parents, dtype=np.int64).copy()
+        jumps[0] = 0
+        depths = (jumps != np.arange(len(jumps))).astype(np.int64)
+        while np.any(jumps != 0):
+            depths += depths[jumps]
+            jumps = jumps[jumps]
+        return depths
+
+    def get_total_sizes(self) -> np.Array:
+        """Return the total size of every entry.
+
+        Sizes are rolled up to the parents one depth level at a time,
+        from the deepest level upwards."""
+        import numpy as np
+
+        parents = np.frombuffer(self.parents, dtype=np.int64)
+        totals = np.frombuffer(self.sizes, dtype=np.int64).copy()
+        depths = self.get_depths()
+        order = np.argsort(-depths, kind="stable")
+        level_starts = np.flatnonzero(np.diff(depths[order], prepend=-1))
+        for level in np.split(order, level_starts[1:]):
+            if depths[level[0]] == 0:
+                break
+            np.add.at(totals, parents[level], totals[level])
+        return totals
+
+    def get_dir_sizes(self) -> np.Array:
+        import numpy as np
+
+        kinds = np.frombuffer(self.kinds, dtype=np.int8)
+        return self.get_total_sizes()[kinds == self.KIND_DIR]
+
+
+class FsArraysWalker(FsWalker):
+    """FsWalker which builds up an FsArrays tree instead of FsDir/FsFile objects.
+    The que contains entry indices instead of FsDir items."""
+
+    def __init__(self, fs: FsArrays):
+        self.fs = fs
+        self.que = collections.deque([0])
+
+    def parse_ls_line(self, line: str):
+        argument_a, argument_b = line.rstrip().split(" ")
+        if argument_a == "dir":
+            self.fs.add_item(self.que[-1], argument_b, FsArrays.KIND_DIR)
+        else:
+            self.fs.add_item(
+                self.que[-1], argument_b, FsArrays.KIND_FILE, int(argument_a)
+            )
 
+    def get_child(self, directory: int, name: str) -> int:
+        return self.fs.get_child(directory, name)
 
-def part2(root_dir: FsDir) -> int:
+    def get_root(self):
+        return self.fs
+
+
+def parse_input(input_file_path: str, backend: str = "objects") -> FsDir | FsArrays:
+    """Parse the transcript in the input file, and return the root directory
+    (for the "objects" backend) or the FsArrays tree (for the "arrays" backend)."""
+    if backend == "objects":
+        walker = FsWalker(FsDir("/", {}))
+    elif backend == "arrays":
+        walker = FsArraysWalker(FsArrays())
+    else:
+        raise ValueError(f"Unknown backend: {backend}")
+
+    with open(input_file_path, "r") as f:
+        walker.parse_lines(f)
+    return walker.get_root()
+
+
+def get_space_to_free(used_size: int) -> int:
     total_size = 70000000
-    used_size = root_dir.get_size()
     free_space = total_size - used_size
-    space_to_free = 30000000 - free_space
+    return 30000000 - free_space
+
+
+def part1(root_dir: FsDir) -> int:
+    return sum(dirsize for dirsize in root_dir.get_dir_sizes() if dirsize <= 100000)
+
+
+def part2(root_dir: FsDir) -> int:
+    space_to_free = get_space_to_free(root_dir.get_size())
     return min(
-        [
-            dirsize
-            for dirsize in flatten(root_dir.get_dir_sizes())
-            if dirsize >= space_to_free
-        ]
+        dirsize for dirsize in root_dir.get_dir_sizes() if dirsize >= space_to_free
     )
 
 
-def main(input_file_path):
-    with open(input_file_path, "r") as f:
-        input_text = f.read()
-    commands = [s.strip() for s in input_text.split("$") if s != ""]
+def part1_arrays(fs: FsArrays) -> int:
+    dir_sizes = fs.get_dir_sizes()
+    return int(dir_sizes[dir_sizes <= 100000].sum())
 
-    walker = FsWalker(FsDir("/", []))
 
-    for command in commands[1:]:  # skip first "cd /" command
-        walker.parse_command(command)
+def part2_arrays(fs: FsArrays) -> int:
+    dir_sizes = fs.get_dir_sizes()
+    # the root directory is the first directory
+    space_to_free = get_space_to_free(int(dir_sizes[0]))
+    return int(dir_sizes[dir_sizes >= space_to_free].min())
 
-    print(walker.get_root())
-    print("")
 
-    print(f"part 1: {part1(walker.get_root())}")
-    print(f"part 2: {part2(walker.get_root())}")
+def main(
+    input_file_path,
+    backend="objects",
+    print_tree=False,
+    max_depth=None,
+    max_entries=None,
+):
+    root = parse_input(input_file_path, backend)
+
+    if backend == "objects":
+        if print_tree:
+            root.render(sys.stdout, max_depth, max_entries)
+            print("")
+        print(f"part 1: {part1(root)}")
+        print(f"part 2: {part2(root)}")
+    else:
+        print(f"part 1: {part1_arrays(root)}")
+        print(f"part 2: {part2_arrays(root)}")
 
 
 if __name__ == "__main__":
+    import fire
+
     fire.Fire(main)
@@ -1,6 +1,11 @@
 from __future__ import annotations
+from typing import Iterator
+import functools
+import itertools
+import os
 import numpy as np
-import fire
+
+HOT_FUNCTIONS = ("grid_layout", "_shifted_cumulative_max", "_view_distance_from_top")
 
 
 def left_of(matrix: np.Array, row: int, col: int) -> np.Array:
@@ -69,33 +74,297 @@ def tree_score(matrix: np.Array, row: int, col: int) -> int:
     )
 
 
+def _shifted_cumulative_max(matrix: np.Array) -> np.Array:
+    """Return for each item the max. height of all items above it
+    (-1 for the items on the top edge)."""
+    shifted = np.full(matrix.shape, -1, dtype=np.int16)
+    shifted[1:] = np.maximum.accumulate(matrix, axis=0)[:-1]
+    return shifted
+
+
+def _view_distance_from_top(matrix: np.Array) -> np.Array:
+    """Return for each item the amount of trees visible when looking up.
+
+    Sweeps the matrix row by row, keeping track (per column and per height)
+    of the last row that contained a tree at least that tall.
+    The distance to that row is the view distance; this is the "next taller
+    tree" monotonic stack, collapsed into a table since heights are 0..9."""
+    n_rows, n_cols = matrix.shape
+    heights = np.arange(int(matrix.max()) + 1)
+    blocking_row = np.zeros((n_cols, len(heights)), dtype=np.int32)
+    col_idxs = np.arange(n_cols)
+    distances = np.empty(matrix.shape, dtype=np.int32)
+    for row in range(n_rows):
+        row_heights = matrix[row]
+        distances[row] = row - blocking_row[col_idxs, row_heights]
+        # this tree blocks the view of every tree with the same or lower height
+        blocking_row[heights <= row_heights[:, np.newaxis]] = row
+    return distances
+
+
+def _vertically(func: function, matrix: np.Array) -> list[np.Array]:
+    """Apply func (which works from the top) from the top and from the bottom."""
+    return [func(matrix), func(matrix[::-1])[::-1]]
+
+
+def _horizontally(func: function, matrix: np.Array) -> list[np.Array]:
+    """Apply func (which works from the top) from the left and from the right,
+    and return the results re-oriented to match the input matrix."""
+    return [
+        func(np.ascontiguousarray(matrix.T)).T,
+        func(np.ascontiguousarray(matrix.T[::-1]))[::-1].T,
+    ]
+
+
+def _in_all_directions(func: function, matrix: np.Array) -> list[np.Array]:
+    """Apply func (which works from the top) in all four directions,
+    and return the results re-oriented to match the input matrix."""
+    return [*_vertically(func, matrix), *_horizontally(func, matrix)]
+
+
+def _visibility(input_matrix: np.Array, in_directions: function) -> np.Array:
+    return functools.reduce(
+        np.logical_or,
+        [
+            input_matrix > max_in_view
+            for max_in_view in in_directions(_shifted_cumulative_max, input_matrix)
+        ],
+    )
+
+
+def _scenic_score(input_matrix: np.Array, in_directions: function) -> np.Array:
+    return functools.reduce(
+        np.multiply,
+        in_directions(_view_distance_from_top, input_matrix),
+        np.ones(input_matrix.shape, dtype=np.int64),
+    )
+
+
+def visibility_matrix(input_matrix: np.Array) -> np.Array:
+    """Return a boolean matrix which is True for every tree
+    that is visible from outside the grid."""
+    return _visibility(input_matrix, _in_all_directions)
+
+
+def scenic_score_matrix(input_matrix: np.Array) -> np.Array:
+    """Return a matrix with the scenic score of every tree."""
+    return _scenic_score(input_matrix, _in_all_directions)
+
+
+def _run_tile(
+    part: int,
+    axis: int,
+    input_file: str,
+    out_paths: list[str],
+    start: int,
+    stop: int,
+) -> int:
+    """Process a single band of the (memory mapped) grid in input_file
+    for part 1 or 2.
+
+    For a row band (axis 0) the left/right results are written to the memory
+    mapped output files: the visibility from the left or right (part 1), or
+    the left and the right view distances (part 2). For a column band (axis 1)
+    the top/bottom results are combined with those, and the count (part 1)
+    or max. score (part 2) of the band is returned."""
+    buffer = np.memmap(input_file, dtype=np.uint8, mode="r")
+    grid = ascii_grid_view(buffer)
+    outs = [np.load(out_path, mmap_mode="r+") for out_path in out_paths]
+    if axis == 0:
+        # every row is checked here, so the column bands can use the grid as is
+        band = to_heights(grid[start:stop], line_endings_view(buffer)[start:stop])
+        if part == 1:
+            outs[0][start:stop] = _visibility(band, _horizontally)
+        else:
+            distances = _horizontally(_view_distance_from_top, band)
+            for out, direction_distances in zip(outs, distances):
+                out[start:stop] = direction_distances
+        for out in outs:
+            out.flush()
+        return 0
+    else:
+        band = np.ascontiguousarray(grid[:, start:stop]) - np.uint8(ord("0"))
+        if part == 1:
+            return int((_visibility(band, _vertically) | outs[0][:, start:stop]).sum())
+        else:
+            scores = _scenic_score(band, _vertically)
+            for out in outs:
+                scores *= out[:, start:stop]
+            return int(scores.max())
+
+
+def _run_tiled(
+    part: int, input_file: str, n_tiles: int, max_workers: int | None
+) -> list[int]:
+    """Run part 1 or 2 on n_tiles row bands and then n_tiles column bands
+    of the grid in input_file in a process pool, and return the results
+    of the column bands.
+
+    The left/right sweeps only need whole rows and the top/bottom sweeps only
+    whole columns, so the bands are independent and give exact results.
+    The workers memory map the input file, and share the intermediate
+    (left/right) results through memory mapped files. For part 2 those are
+    the left and right view distances, which are much smaller than their
+    product (at most n_cols - 1 each)."""
+    from concurrent.futures import ProcessPoolExecutor
+    import tempfile
+
+    if n_tiles < 1:
+        raise ValueError("n_tiles should be at least 1")
+    if os.path.getsize(input_file) == 0:
+        raise ValueError("The grid is empty")
+    n_rows, n_cols, _ = grid_layout(np.memmap(input_file, dtype=np.uint8, mode="r"))
+    if part == 1:
+        out_dtypes = [bool]
+    else:
+        distance_dtype = np.uint16 if n_cols <= np.iinfo(np.uint16).max else np.uint32
+        out_dtypes = [distance_dtype, distance_dtype]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        out_paths = []
+        for idx, dtype in enumerate(out_dtypes):
+            out_paths.append(os.path.join(tmp_dir, f"out_{idx}.npy"))
+            np.lib.format.open_memmap(
+                out_paths[-1], mode="w+", dtype=dtype, shape=(n_rows, n_cols)
+            ).flush()
+
+        with ProcessPoolExecutor(max_workers) as executor:
+            for axis, size in ((0, n_rows), (1, n_cols)):
+                bounds = np.linspace(0, size, min(n_tiles, size) + 1).astype(int)
+                results = list(
+                    executor.map(
+                        _run_tile,
+                        itertools.repeat(part),
+                        itertools.repeat(axis),
+                        itertools.repeat(input_file),
+                        itertools.repeat(out_paths),
+                        bounds[:-1].tolist(),
+                        bounds[1:].tolist(),
+                    )
+                )
+    return results
+
+
 def part1(input_matrix: np.Array) -> int:
-    tallest_counter = 0
-    for col in range(input_matrix.shape[0]):
-        for row in range(input_matrix.shape[1]):
-            if is_tallest_in_any_direction(input_matrix, row, col):
-                tallest_counter += 1
-    return tallest_counter
+    return int(visibility_matrix(input_matrix).sum())
 
 
 def part2(input_matrix: np.Array) -> int:
-    tree_score_matrix = np.zeros(input_matrix.shape)
-    for col in range(input_matrix.shape[0]):
-        for row in range(input_matrix.shape[1]):
-            tree_score_matrix[row, col] = tree_score(input_matrix, row, col)
-    return int(tree_score_matrix.max())
-
-
-def main(input_file: str):
-    with open(input_file) as f:
-        input_text = f.read().strip()
-    input_matrix = np.array(
-        [[int(char) for char in list(line)] for line in input_text.split("\n")]
+    return int(scenic_score_matrix(input_matrix).max())
+
+
+def part1_tiled(input_file: str, n_tiles: int, max_workers: int | None = None) -> int:
+    """Part 1 for the grid in input_file, processed in bands in a process pool
+    (without loading the whole grid in memory)."""
+    return sum(_run_tiled(1, input_file, n_tiles, max_workers))
+
+
+def part2_tiled(input_file: str, n_tiles: int, max_workers: int | None = None) -> int:
+    """Part 2 for the grid in input_file, processed in bands in a process pool
+    (without loading the whole grid in memory)."""
+    return max(_run_tiled(2, input_file, n_tiles, max_workers))
+
+
+def grid_layout(buffer) -> tuple[int, int, int]:
+    """Return (n_rows, n_cols, line_length) of a grid of digits in buffer,
+    where line_length includes the line ending ("\n" or "\r\n").
+
+    Raises a ValueError if the size of the buffer doesn't fit that layout
+    (line endings after the last row are optional)."""
+    end = len(buffer)
+    while end > 0 and buffer[end - 1] in b"\r\n":
+        end -= 1
+    if end == 0:
+        return 0, 0, 1
+    # find the end of the first line, without scanning the whole buffer
+    search_size = 4096
+    while True:
+        n_cols = bytes(buffer[: min(search_size, end)]).find(b"\n")
+        if n_cols != -1 or search_size >= end:
+            break
+        search_size *= 2
+    if n_cols == -1:
+        return 1, end, end + 1
+    line_length = n_cols + 1
+    if n_cols > 0 and buffer[n_cols - 1] == ord("\r"):
+        n_cols -= 1
+    if (end + line_length - n_cols) % line_length != 0:
+        raise ValueError("All rows of the grid should have the same length")
+    return (end + line_length - n_cols) // line_length, n_cols, line_length
+
+
+def ascii_grid_view(buffer) -> np.Array:
+    """Return a (n_rows, n_cols) view on the ASCII digits in buffer,
+    skipping the line endings without copying anything."""
+    n_rows, n_cols, line_length = grid_layout(buffer)
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    return np.lib.stride_tricks.as_strided(
+        data, shape=(n_rows, n_cols), strides=(line_length, 1), writeable=False
     )
 
+
+def line_endings_view(buffer) -> np.Array:
+    """Return a (n_rows - 1, len(line ending)) view on the line endings
+    between the rows of the grid in buffer."""
+    n_rows, n_cols, line_length = grid_layout(buffer)
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    return np.lib.stride_tricks.as_strided(
+        data[n_cols:],
+        shape=(max(n_rows - 1, 0), line_length - n_cols),
+        strides=(line_length, 1),
+        writeable=False,
+    )
+
+
+def to_heights(ascii_grid: np.Array, line_endings: np.Array) -> np.Array:
+    """Return the tree heights of (a band of) the views of ascii_grid_view and
+    line_endings_view as a uint8 matrix, checking that those contain only digits
+    and line endings. Without those checks a ragged grid would silently
+    give wrong heights."""
+    expected = np.frombuffer(b"\r\n"[-line_endings.shape[1] :], dtype=np.uint8)
+    if np.any(line_endings != expected):
+        raise ValueError("All rows of the grid should have the same length")
+    heights = ascii_grid - np.uint8(ord("0"))
+    # (bytes below "0" wrap around to large values)
+    if np.any(heights > 9):
+        raise ValueError("The grid should only contain digits")
+    return heights
+
+
+def parse_input(input_file: str) -> np.Array:
+    """Return the tree heights in the input file as a uint8 matrix."""
+    with open(input_file, "rb") as f:
+        buffer = f.read()
+    return to_heights(ascii_grid_view(buffer), line_endings_view(buffer))
+
+
+def iter_row_bands(input_file: str, band_rows: int = 1024) -> Iterator[np.Array]:
+    """Yield the tree heights in the input file as uint8 matrices of (at most)
+    band_rows rows each. The file is memory mapped, so only the rows of the
+    current band are read and converted."""
+    if os.path.getsize(input_file) == 0:
+        # empty files can't be memory mapped
+        return
+    buffer = np.memmap(input_file, dtype=np.uint8, mode="r")
+    grid = ascii_grid_view(buffer)
+    line_endings = line_endings_view(buffer)
+    for start_row in range(0, grid.shape[0], band_rows):
+        stop_row = start_row + band_rows
+        yield to_heights(grid[start_row:stop_row], line_endings[start_row:stop_row])
+
+
+def main(input_file: str, n_tiles=None, max_workers=None):
+    if n_tiles is not None:
+        print(f"part 1: {part1_tiled(input_file, n_tiles, max_workers)}")
+        print(f"part 2: {part2_tiled(input_file, n_tiles, max_workers)}")
+        return
+
+    input_matrix = parse_input(input_file)
     print(f"part 1: {part1(input_matrix)}")
     print(f"part 2: {part2(input_matrix)}")
 
 
 if __name__ == "__main__":
+    import fire
+
     fire.Fire(main)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+import hashlib
+import os
+import pickle
+import numpy as np
+
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".input_cache"
+
+
+def file_hash(path: Path | str) -> str:
+    """Returns the sha256 hex digest of the contents of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(2**20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class InputCache:
+    """On-disk cache of parsed inputs.
+
+    Entries are keyed on the hash of the input file contents and the hash of
+    the source of the day module (as parser version: any change to the module
+    invalidates its entries). Numpy arrays are stored as .npy files,
+    anything else is pickled.
+
+    The cache directory is kept below max_bytes by removing the least recently
+    used entries (the modification time of an entry is updated when it is used)."""
+
+    def __init__(self, cache_dir: Path | str = DEFAULT_CACHE_DIR, max_bytes=2**29):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get_key(self, module: ModuleType, input_file: str) -> str:
+        parser_version = file_hash(module.__file__)[:16]
+        return f"{module.__name__}-{parser_version}-{file_hash(input_file)[:32]}"
+
+    def load(self, key: str) -> tuple[bool, Any]:
+        """Returns (True, value) for a cached key, (False, None) otherwise."""
+        for path in (self.cache_dir / f"{key}.npy", self.cache_dir / f"{key}.pkl"):
+            if path.exists():
+                os.utime(path)
+                if path.suffix == ".npy":
+                    return True, np.load(path)
+                with open(path, "rb") as f:
+                    return True, pickle.load(f)
+        return False, None
+
+    def store(self, key: str, value: Any) -> None:
+        suffix = ".npy" if isinstance(value, np.ndarray) else ".pkl"
+        path = self.cache_dir / f"{key}{suffix}"
+        # write to a temporary file first, such that other processes
+        # never see a partially written entry
+        tmp_path = self.cache_dir / f"{key}{suffix}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                if suffix == ".npy":
+                    np.save(f, value)
+                else:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, RecursionError, TypeError):
+            # e.g. very deep trees; just don't cache these
+            tmp_path.unlink()
+            return
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for path in self.cache_dir.iterdir():
+            if path.suffix in (".npy", ".pkl"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    # removed by another process in the meantime
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total_size <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+
+    def parse_input(self, module: ModuleType, input_file: str) -> Any:
+        """Returns module.parse_input(input_file), from the cache if possible."""
+        key = self.get_key(module, input_file)
+        found, value = self.load(key)
+        if not found:
+            value = module.parse_input(input_file)
+            self.store(key, value)
+        return value
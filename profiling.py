@@ -0,0 +1,172 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter_ns
+from types import ModuleType
+from typing import Callable, Iterable, Iterator
+import contextlib
+import cProfile
+import functools
+import tracemalloc
+
+
+# parse_input and the parts are always profiled, next to the HOT_FUNCTIONS of a module
+STAGES = ("parse_input", "part1", "part2")
+
+_missing = object()
+
+
+@dataclass
+class FunctionStats:
+    """Totals of all calls of a single function (recursive calls are only
+    counted, their time and memory is part of the outermost call)."""
+
+    calls: int = 0
+    total_ns: int = 0
+    peak_bytes: int = 0
+
+
+class Profiler:
+    """Instrumentation of named functions of day modules.
+
+    A day module lists its hot functions in a module level HOT_FUNCTIONS tuple,
+    which are instrumented next to the STAGES (parse_input and the parts).
+    Functions are given by their name in the module, e.g. "part1" or
+    "FsDir.get_size", and are replaced by wrappers recording the number of calls,
+    the wall time and the peak memory allocated during a call (with tracemalloc).
+    The original functions are put back when leaving the instrumented context,
+    so nothing is instrumented (and there is no overhead) outside of it.
+
+    Note that tracemalloc slows down allocations, which is included in the wall times.
+    If profile_dir is given, a cProfile of every run is dumped there as well."""
+
+    def __init__(self, profile_dir: Path | str | None = None):
+        self.profile_dir = None if profile_dir is None else Path(profile_dir)
+        self.stats = {}  # (day, input name, function name) -> FunctionStats
+        # [start bytes, peak bytes] of the instrumented calls which are running
+        self._running = []
+
+    def __enter__(self) -> Profiler:
+        tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def instrumented(
+        self, module: ModuleType, day: int, input_name: str
+    ) -> Iterator[None]:
+        """Instrument the stages and the HOT_FUNCTIONS of a day module within
+        the context, recording their stats under (day, input_name)."""
+        patches = []  # (owner, attribute, original value or _missing)
+        try:
+            for name in (*STAGES, *getattr(module, "HOT_FUNCTIONS", ())):
+                *owner_path, attribute = name.split(".")
+                owner = functools.reduce(getattr, owner_path, module)
+                original = vars(owner).get(attribute, _missing)
+                stats = self.stats.setdefault((day, input_name, name), FunctionStats())
+                patches.append((owner, attribute, original))
+                setattr(owner, attribute, self.wrap(getattr(owner, attribute), stats))
+            yield
+        finally:
+            for owner, attribute, original in reversed(patches):
+                if original is _missing:
+                    # inherited from a base class
+                    delattr(owner, attribute)
+                else:
+                    setattr(owner, attribute, original)
+
+    def _fold_peak(self) -> None:
+        """Add the current peak to all running calls, and reset it."""
+        _, peak = tracemalloc.get_traced_memory()
+        for running in self._running:
+            running[1] = max(running[1], peak)
+        tracemalloc.reset_peak()
+
+    def wrap(self, func: Callable, stats: FunctionStats) -> Callable:
+        depth = 0
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal depth
+            stats.calls += 1
+            if depth:
+                return func(*args, **kwargs)
+            self._fold_peak()
+            running = [tracemalloc.get_traced_memory()[0], 0]
+            self._running.append(running)
+            depth += 1
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.total_ns += perf_counter_ns() - start
+                depth -= 1
+                self._fold_peak()
+                self._running.pop()
+                stats.peak_bytes = max(stats.peak_bytes, running[1] - running[0])
+
+        return wrapper
+
+    def run(self, func: Callable, day: int, input_name: str, *args):
+        """Returns func(*args), dumping a cProfile of the call if profile_dir is set."""
+        if self.profile_dir is None:
+            return func(*args)
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        with cProfile.Profile() as profile:
+            result = func(*args)
+        profile.dump_stats(
+            self.profile_dir / f"day_{day}-{Path(input_name).stem}.pstats"
+        )
+        return result
+
+    def rows(self) -> list[dict]:
+        """Returns the stats as rows, ordered by day, input, stage and function name."""
+
+        def order(key: tuple[int, str, str]) -> tuple:
+            day, input_name, name = key
+            stage = STAGES.index(name) if name in STAGES else len(STAGES)
+            return day, input_name, stage, name
+
+        return [
+            {
+                "day": day,
+                "input": input_name,
+                "function": name,
+                "calls": stats.calls,
+                "total_ns": stats.total_ns,
+                "peak_bytes": stats.peak_bytes,
+            }
+            for (day, input_name, name), stats in sorted(
+                self.stats.items(), key=lambda item: order(item[0])
+            )
+        ]
+
+
+def format_report(rows: Iterable[dict]) -> str:
+    """Returns the profile rows as a text table with one line per function,
+    in a fixed order such that reports of different runs can be diffed."""
+    header = ("day", "input", "function", "calls", "total ms", "peak KiB")
+    lines = [
+        (
+            str(row["day"]),
+            row["input"],
+            row["function"],
+            str(row["calls"]),
+            f"{row['total_ns'] / 1e6:.3f}",
+            f"{row['peak_bytes'] / 1024:.1f}",
+        )
+        for row in rows
+    ]
+    widths = [max(len(line[col]) for line in [header, *lines]) for col in range(6)]
+    return "\n".join(
+        "  ".join(
+            value.ljust(width) if col < 3 else value.rjust(width)
+            for col, (value, width) in enumerate(zip(line, widths))
+        ).rstrip()
+        for line in [header, *lines]
+    )
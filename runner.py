@@ -0,0 +1,197 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter_ns
+from types import ModuleType
+from typing import Any, Callable
+import functools
+import importlib.util
+import json
+import re
+import sys
+from input_cache import InputCache
+from profiling import Profiler, format_report
+
+
+ROOT_DIR = Path(__file__).parent
+
+
+def discover_days(root_dir: Path = ROOT_DIR) -> dict[int, Path]:
+    """Returns the path of the solver module of every day_N directory, by day number."""
+    days = {}
+    for module_path in root_dir.glob("day_*/day_*.py"):
+        match = re.fullmatch(r"day_([0-9]+)", module_path.stem)
+        if match and module_path.parent.name == module_path.stem:
+            days[int(match.group(1))] = module_path
+    return dict(sorted(days.items()))
+
+
+def load_day(module_path: Path) -> ModuleType:
+    """Import a day module from its path.
+
+    Each day module provides the same interface:
+    parse_input(input_file), part1(input) and part2(input)."""
+    module_name = module_path.stem
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def timed(func: Callable, *args) -> tuple[Any, int]:
+    """Returns the result of func(*args) and its wall time in ns."""
+    start = perf_counter_ns()
+    result = func(*args)
+    return result, perf_counter_ns() - start
+
+
+def discover_inputs(module_path: Path) -> list[str]:
+    """Returns the names of all input files (*input*.txt) in the directory of a day."""
+    return sorted(path.name for path in module_path.parent.glob("*input*.txt"))
+
+
+def get_parse_func(module: ModuleType, cache: InputCache | None) -> Callable:
+    """Returns the parse_input function of module, going through cache if given."""
+    if cache is None:
+        return module.parse_input
+    return functools.partial(cache.parse_input, module)
+
+
+def run_day(
+    day: int,
+    module_path: Path,
+    input_name: str = "input.txt",
+    cache: InputCache | None = None,
+    profiler: Profiler | None = None,
+) -> dict:
+    """Parse the input of a day and run both parts on it,
+    timing each of those steps separately.
+
+    With a profiler the stages and hot functions of the day are instrumented."""
+    module = load_day(module_path)
+    if profiler is not None:
+        with profiler.instrumented(module, day, input_name):
+            return profiler.run(
+                run_day, day, input_name, day, module_path, input_name, cache
+            )
+    input_file = str(module_path.parent / input_name)
+    input, parse_ns = timed(get_parse_func(module, cache), input_file)
+    part1, part1_ns = timed(module.part1, input)
+    part2, part2_ns = timed(module.part2, input)
+    return {
+        "day": day,
+        "input": input_name,
+        "part1": part1,
+        "part2": part2,
+        "parse_ns": parse_ns,
+        "part1_ns": part1_ns,
+        "part2_ns": part2_ns,
+    }
+
+
+def run_parallel(
+    day_inputs: list[tuple[int, Path, str]],
+    max_workers: int | None = None,
+    cache: InputCache | None = None,
+) -> list[dict]:
+    """Run both parts for all (day, module_path, input_name) combinations
+    in a process pool, and return the results in the order of day_inputs.
+
+    Every input is a single task (see run_day), so it is parsed only once
+    and both parts run on it in the same worker."""
+    with ProcessPoolExecutor(max_workers) as executor:
+        futures = [
+            executor.submit(run_day, day, module_path, input_name, cache)
+            for day, module_path, input_name in day_inputs
+        ]
+        return [future.result() for future in futures]
+
+
+def format_table(results: list[dict]) -> str:
+    """Returns the results as a text table, with the timings in ms."""
+    header = ("day", "input", "part 1", "part 2", "parse ms", "part1 ms", "part2 ms")
+    rows = [
+        (
+            str(result["day"]),
+            result["input"],
+            str(result["part1"]),
+            str(result["part2"]),
+            *[
+                f"{result[key] / 1e6:.3f}"
+                for key in ("parse_ns", "part1_ns", "part2_ns")
+            ],
+        )
+        for result in results
+    ]
+    widths = [max(len(row[col]) for row in [header, *rows]) for col in range(7)]
+    return "\n".join(
+        "  ".join(value.rjust(width) for value, width in zip(row, widths))
+        for row in [header, *rows]
+    )
+
+
+def main(
+    days=None,
+    input_name="input.txt",
+    all_inputs=False,
+    as_json=False,
+    parallel=False,
+    max_workers=None,
+    cache=False,
+    profile=False,
+    profile_dir=None,
+):
+    """Run all days (or only the given day number(s)) and print the results
+    with the parse/part 1/part 2 timings, as a table or as JSON.
+
+    With all_inputs every *input*.txt file of each day is used instead of input_name.
+    With parallel the inputs are run in a process pool (each input in a single task).
+    With cache the parsed inputs are stored on disk (see InputCache),
+    such that following runs skip parsing unchanged inputs.
+    With profile the calls, wall time and peak memory of the stages and hot functions
+    of each day are reported as well (see Profiler), and with profile_dir a cProfile
+    of every day is dumped there (as day_N-input.pstats)."""
+    if profile and parallel:
+        raise ValueError("profile can't be combined with parallel")
+
+    module_paths = discover_days()
+    if days is not None:
+        days = days if isinstance(days, (list, tuple)) else [days]
+        module_paths = {day: module_paths[day] for day in days}
+
+    day_inputs = [
+        (day, module_path, name)
+        for day, module_path in module_paths.items()
+        for name in (discover_inputs(module_path) if all_inputs else [input_name])
+        if (module_path.parent / name).exists()
+    ]
+
+    input_cache = InputCache() if cache else None
+    if parallel:
+        results = run_parallel(day_inputs, max_workers, input_cache)
+    elif profile:
+        with Profiler(profile_dir) as profiler:
+            results = [
+                run_day(*day_input, input_cache, profiler) for day_input in day_inputs
+            ]
+        profile_rows = profiler.rows()
+    else:
+        results = [run_day(*day_input, input_cache) for day_input in day_inputs]
+
+    if as_json:
+        output = {"results": results, "profile": profile_rows} if profile else results
+        print(json.dumps(output, indent=2))
+    else:
+        print(format_table(results))
+        if profile:
+            print("")
+            print(format_report(profile_rows))
+
+
+if __name__ == "__main__":
+    import fire
+
+    fire.Fire(main)